@@ -3,29 +3,47 @@ from __future__ import annotations
 import re
 
 
-from nltk.corpus import cmudict
 import logging
+import os
 import subprocess
 import tempfile
+import threading
 import uuid
 from pathlib import Path
 from typing import List, Tuple, Union
 from fastapi import Form
 from textgrid import TextGrid 
-cmu=cmudict.dict()
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 MFA_PRETRAINED_MODEL = "english_us_arpa"
 MFA_DICTIONARY = "english_us_arpa"
 MFA_OUTPUT_DIR = "mfa_outputs"
+# optional clip + transcript used to run one real MFA alignment during warm-up
+WARM_UP_AUDIO = os.getenv("ALIGNMENT_WARM_UP_AUDIO")
+WARM_UP_TEXT = os.getenv("ALIGNMENT_WARM_UP_TEXT", "hello world")
+
+
+_cmu: dict | None = None
+_cmu_lock = threading.Lock()
+
+
+def get_cmudict() -> dict:
+    """Load CMUdict on first use instead of at import (it takes seconds); thread-safe."""
+    global _cmu
+    if _cmu is None:
+        with _cmu_lock:
+            if _cmu is None:
+                from nltk.corpus import cmudict
+                _cmu = cmudict.dict()
+    return _cmu
 
 
 def expect(reftext: str)-> List[str]:
      
     expected:List[str]=[]
     textused=re.findall(r"\b[\w']+\b", reftext.strip().lower())
-   
+    cmu = get_cmudict()
 
     for word in textused:
         if word in cmu:
@@ -110,6 +128,20 @@ class PhonemeAligner:
             raise FileNotFoundError("No TextGrid produced")
         return grids[0]
     
+    def warm_up(self) -> None:
+        """
+        Load CMUdict and check the MFA binary; if ALIGNMENT_WARM_UP_AUDIO is
+        set, also align that clip so MFA's models are cached before traffic.
+        """
+        if not expect(WARM_UP_TEXT):
+            raise RuntimeError("CMUdict lookup returned no phonemes")
+        proc = subprocess.run(["mfa", "version"], capture_output=True, text=True)
+        if proc.returncode:
+            raise RuntimeError(f"MFA unavailable: {proc.stderr.strip()}")
+        logger.info("MFA %s ready", proc.stdout.strip())
+        if WARM_UP_AUDIO:
+            self.align_audio_with_text(WARM_UP_AUDIO, WARM_UP_TEXT, WARM_UP_TEXT)
+
     def align_audio_with_text(self, audio: Union[bytes, str, Path], text: str, reftext:str) -> dict:
         audio_bytes = self._as_bytes(audio)
 
@@ -1,12 +1,50 @@
 
 from fastapi import FastAPI, File, Form, UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from pathlib import Path
+import logging
+import threading
+import time
 
 from app.aligner import PhonemeAligner         
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI()
 aligner = PhonemeAligner()
+warm_up_state = {"status": "starting", "error": None, "started_at": time.time(), "duration": None}
+
+
+def _warm_up():
+    started = time.perf_counter()
+    try:
+        aligner.warm_up()
+        warm_up_state["status"] = "ready"
+    except Exception as e:
+        warm_up_state.update(status="failed", error=str(e))
+        logger.error(f"Alignment warm-up failed: {e}")
+    finally:
+        warm_up_state["duration"] = round(time.perf_counter() - started, 3)
+
+
+@app.on_event("startup")
+def start_warm_up():
+    threading.Thread(target=_warm_up, name="alignment-warm-up", daemon=True).start()
+
+
+@app.get("/health")
+@app.get("/health/live")
+async def health_check():
+    return {"status": "healthy", "service": "alignment-service"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    body = {"service": "alignment-service", **warm_up_state}
+    return JSONResponse(status_code=200 if warm_up_state["status"] == "ready" else 503, content=body)
+
 class AlignResponse(BaseModel):
     alignment: list
     expected_phonemes: list[str]
@@ -20,8 +58,10 @@ async def align_audio(file: UploadFile = File(...), text: str = Form(...),reftex
     • text: reference transcript
     • reftext: reference text
     """
+    audio = await file.read()
     try:
-        data = aligner.align_audio_with_text(await file.read(), text,reftext)
+        # MFA runs as a blocking subprocess; keep it off the event loop so health checks stay responsive
+        data = await run_in_threadpool(aligner.align_audio_with_text, audio, text, reftext)
         return data
     except Exception as e:
         raise HTTPException(500, f"Alignment error: {e}")
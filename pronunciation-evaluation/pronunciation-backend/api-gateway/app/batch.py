@@ -0,0 +1,315 @@
+"""
+Batch pronunciation evaluation over a manifest of recordings.
+
+    python -m app.batch manifest.csv -o results.jsonl
+    python -m app.batch manifest.jsonl -o results/ --format parquet --asr-workers 1 --align-workers 8
+
+The manifest is a CSV with a header row, or JSONL, with the fields
+``audio`` (WAV path, relative paths resolve against the manifest) and
+``text`` (reference text), plus an optional ``id`` (defaults to the row
+number).
+
+ASR, alignment and scoring run in-process, each in its own pool of worker
+threads, connected by bounded queues so Whisper, MFA and scoring overlap
+while memory stays flat. Only successful rows go to the output, so each id
+appears there once; rows that fail are appended to ``<output>.errors``
+(JSONL, one line per failed attempt, with ``failed_stage`` and ``error``).
+Re-running the same command skips ids already in the output and retries
+the rest. Per-stage throughput is printed while the run progresses.
+"""
+import argparse
+import csv
+import json
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from app.services.local import load_phoneme_aligner, load_pronunciation_scorer, load_whisper_asr
+
+_DONE = object()
+
+PARQUET_COLUMNS = [
+    ("id", "string"), ("audio", "string"), ("text", "string"), ("transcription", "string"),
+    ("pronunciation_accuracy", "float64"), ("speech_rate", "float64"), ("pause_count", "int64"),
+    ("avg_phoneme_duration", "float64"), ("error_analysis", "string"), ("phoneme_alignment", "string"),
+]
+
+
+def read_manifest(path: Path) -> Iterator[Dict[str, str]]:
+    with open(path, encoding="utf8", newline="") as f:
+        rows = (json.loads(line) for line in f if line.strip()) if path.suffix == ".jsonl" else csv.DictReader(f)
+        for n, row in enumerate(rows):
+            if not row.get("audio") or not row.get("text"):
+                raise ValueError(f"{path}: row {n} needs both 'audio' and 'text'")
+            audio = Path(row["audio"])
+            if not audio.is_absolute():
+                audio = path.parent / audio
+            yield {"id": str(row.get("id") or n), "audio": str(audio), "text": row["text"]}
+
+
+class Stage:
+    """A pool of worker threads reading from one bounded queue and writing to the next."""
+
+    def __init__(self, name: str, workers: int, make_handler: Callable[[], Callable[[dict], None]],
+                 inbox: queue.Queue, outbox: queue.Queue, downstream_workers: int):
+        self.name = name
+        self.workers = workers
+        self.make_handler = make_handler
+        self.inbox = inbox
+        self.outbox = outbox
+        self.downstream_workers = downstream_workers
+        self.processed = 0
+        self.busy = 0.0
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        self._threads = [threading.Thread(target=self._work, name=f"{self.name}-{i}", daemon=True)
+                         for i in range(self.workers)]
+        for t in self._threads:
+            t.start()
+        threading.Thread(target=self._finish, name=f"{self.name}-finish", daemon=True).start()
+
+    def _work(self) -> None:
+        # each worker owns its model instance, so stages never share one across threads
+        handler = None
+        while True:
+            item = self.inbox.get()
+            if item is _DONE:
+                return
+            if "error" not in item:
+                started = time.perf_counter()
+                try:
+                    if handler is None:
+                        handler = self.make_handler()
+                    handler(item)
+                except Exception as e:
+                    item.update(failed_stage=self.name, error=str(e))
+                with self._lock:
+                    self.processed += 1
+                    self.busy += time.perf_counter() - started
+            self.outbox.put(item)
+
+    def _finish(self) -> None:
+        for t in self._threads:
+            t.join()
+        for _ in range(self.downstream_workers):
+            self.outbox.put(_DONE)
+
+
+def _asr_handler():
+    asr = load_whisper_asr()()
+
+    def handle(item):
+        result = asr.transcribe(item["audio"])
+        if "error" in result:
+            raise RuntimeError(result["error"])
+        if not result.get("transcription"):
+            raise RuntimeError("No transcription returned")
+        item["transcription"] = result["transcription"]
+    return handle
+
+
+def _reference_handler():
+    # mirrors /api/v1/analyze, where the ASR service echoes the reference text back
+    def handle(item):
+        item["transcription"] = item["text"]
+    return handle
+
+
+def _align_handler():
+    aligner = load_phoneme_aligner()()
+
+    def handle(item):
+        item["phoneme_alignment"] = aligner.align_audio_with_text(item["audio"], item["transcription"], item["text"])
+    return handle
+
+
+def _score_handler(pause_threshold: float):
+    def make():
+        scorer = load_pronunciation_scorer()(pause_threshold=pause_threshold)
+
+        def handle(item):
+            item["pronunciation_score"] = scorer.score(item["phoneme_alignment"])
+        return handle
+    return make
+
+
+class JsonlSink:
+    def __init__(self, path: Path):
+        self.path = path
+        if path.exists():
+            # drop a partial line left by an interrupted run
+            with open(path, "rb+") as f:
+                data = f.read()
+                f.truncate(data.rfind(b"\n") + 1)
+        self._file = open(path, "a", encoding="utf8")
+
+    def existing_ids(self) -> Set[str]:
+        with open(self.path, encoding="utf8") as f:
+            return {json.loads(line)["id"] for line in f if line.strip()}
+
+    def write(self, record: dict) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ParquetSink:
+    """Writes numbered part files into a directory, one per ``flush_every`` rows."""
+
+    def __init__(self, path: Path, flush_every: int = 1000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet output requires pyarrow: pip install pyarrow")
+        self._pa, self._pq = pa, pq
+        self._schema = pa.schema([(name, getattr(pa, t)()) for name, t in PARQUET_COLUMNS])
+        self.path = path
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.flush_every = flush_every
+        self._rows: List[dict] = []
+        self._part = len(list(path.glob("part-*.parquet")))
+
+    def existing_ids(self) -> Set[str]:
+        # parts are renamed into place only when complete, so every part is readable
+        return {i for part in sorted(self.path.glob("part-*.parquet"))
+                for i in self._pq.read_table(part, columns=["id"]).column("id").to_pylist()}
+
+    def write(self, record: dict) -> None:
+        score = record.get("pronunciation_score") or {}
+        fluency = score.get("fluency") or {}
+        self._rows.append({
+            "id": record["id"], "audio": record["audio"], "text": record["text"],
+            "transcription": record.get("transcription"),
+            "pronunciation_accuracy": score.get("pronunciation_accuracy"),
+            "speech_rate": fluency.get("speech_rate"),
+            "pause_count": fluency.get("pause_count"),
+            "avg_phoneme_duration": fluency.get("avg_phoneme_duration"),
+            "error_analysis": json.dumps(score["error_analysis"]) if "error_analysis" in score else None,
+            "phoneme_alignment": json.dumps(record["phoneme_alignment"]) if "phoneme_alignment" in record else None,
+        })
+        if len(self._rows) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._rows:
+            return
+        target = self.path / f"part-{self._part:05d}.parquet"
+        tmp = target.with_suffix(".tmp")
+        self._pq.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema), tmp)
+        tmp.replace(target)
+        self._part += 1
+        self._rows = []
+
+    def close(self) -> None:
+        self.flush()
+
+
+def _report(stages: List[Stage], written: int, failed: int, total: int, started: float) -> None:
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    parts = [f"{s.name} {s.processed / elapsed:6.2f}/s ({s.processed}, busy {s.busy / (elapsed * s.workers):4.0%})"
+             for s in stages]
+    sys.stderr.write(f"[{elapsed:7.1f}s] " + " | ".join(parts) + f" | written {written}, failed {failed} of {total}\n")
+    sys.stderr.flush()
+
+
+def run(manifest: Path, output: Path, fmt: str = "jsonl", asr_workers: int = 1, align_workers: int = 4,
+        score_workers: int = 1, queue_size: int = 32, skip_asr: bool = False, pause_threshold: float = 0.3,
+        flush_every: int = 1000, report_every: float = 10.0) -> Tuple[int, int]:
+    """Evaluate every manifest row not yet in the output; returns (written, failed)."""
+    sink = ParquetSink(output, flush_every) if fmt == "parquet" else JsonlSink(output)
+    # the output itself is the checkpoint: a row is done once it has been written
+    done_ids = sink.existing_ids()
+    items = [row for row in read_manifest(manifest) if row["id"] not in done_ids]
+    total = len(items)
+    if done_ids:
+        sys.stderr.write(f"Resuming: {len(done_ids)} already done, {total} remaining\n")
+    if not total:
+        sink.close()
+        return 0, 0
+
+    errors = JsonlSink(Path(str(output).rstrip("/\\") + ".errors"))
+
+    to_asr, to_align, to_score, to_sink = (queue.Queue(maxsize=queue_size) for _ in range(4))
+    stages = [
+        Stage("asr", asr_workers, _reference_handler if skip_asr else _asr_handler, to_asr, to_align, align_workers),
+        Stage("align", align_workers, _align_handler, to_align, to_score, score_workers),
+        Stage("score", score_workers, _score_handler(pause_threshold), to_score, to_sink, 1),
+    ]
+    for stage in stages:
+        stage.start()
+
+    def feed():
+        for item in items:
+            to_asr.put(item)
+        for _ in range(asr_workers):
+            to_asr.put(_DONE)
+
+    threading.Thread(target=feed, name="manifest-reader", daemon=True).start()
+
+    started = last_report = time.perf_counter()
+    written = failed = 0
+    try:
+        while True:
+            try:
+                item = to_sink.get(timeout=1.0)
+            except queue.Empty:
+                item = None
+            if item is _DONE:
+                break
+            if item is not None:
+                if "error" in item:
+                    errors.write(item)
+                    failed += 1
+                else:
+                    sink.write(item)
+                    written += 1
+            if time.perf_counter() - last_report >= report_every:
+                _report(stages, written, failed, total, started)
+                last_report = time.perf_counter()
+    finally:
+        sink.close()
+        errors.close()
+    _report(stages, written, failed, total, started)
+    return written, failed
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("manifest", type=Path, help="CSV or JSONL manifest with audio and text fields")
+    parser.add_argument("-o", "--output", type=Path, required=True,
+                        help="JSONL file, or a directory of part files for --format parquet")
+    parser.add_argument("--format", choices=["jsonl", "parquet"], default="jsonl")
+    parser.add_argument("--asr-workers", type=int, default=1, help="each worker loads its own Whisper model")
+    parser.add_argument("--align-workers", type=int, default=4, help="concurrent MFA processes")
+    parser.add_argument("--score-workers", type=int, default=1)
+    parser.add_argument("--queue-size", type=int, default=32, help="bound of each inter-stage queue")
+    parser.add_argument("--skip-asr", action="store_true",
+                        help="use the reference text as the transcription, as /api/v1/analyze does")
+    parser.add_argument("--pause-threshold", type=float, default=0.3)
+    parser.add_argument("--flush-every", type=int, default=1000, help="rows per Parquet part file")
+    parser.add_argument("--report-every", type=float, default=10.0, help="seconds between throughput reports")
+    args = parser.parse_args(argv)
+
+    try:
+        written, failed = run(args.manifest, args.output, fmt=args.format, asr_workers=args.asr_workers,
+                      align_workers=args.align_workers, score_workers=args.score_workers,
+                      queue_size=args.queue_size, skip_asr=args.skip_asr, pause_threshold=args.pause_threshold,
+                      flush_every=args.flush_every, report_every=args.report_every)
+    except KeyboardInterrupt:
+        sys.stderr.write("Interrupted; re-run the same command to resume\n")
+        sys.exit(130)
+    sys.stderr.write(f"Wrote {written} results to {args.output}\n")
+    if failed:
+        sys.stderr.write(f"{failed} rows failed, see {str(args.output).rstrip('/')}.errors; re-run to retry them\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+import calendar
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH", "history.db")
+# opt-in: append each result's alignment_data, keyed by results.id, for `app.archive pack`
+ALIGNMENT_CAPTURE_PATH = os.getenv("ALIGNMENT_CAPTURE_PATH")
+WRITE_BATCH_SIZE = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    learner_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    reference_text TEXT,
+    transcription TEXT,
+    accuracy REAL,
+    speech_rate REAL,
+    pause_count INTEGER,
+    avg_phoneme_duration REAL,
+    error_count INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_results_learner_time ON results (learner_id, created_at);
+
+CREATE TABLE IF NOT EXISTS phoneme_errors (
+    result_id INTEGER NOT NULL,
+    learner_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    kind TEXT NOT NULL,
+    expected TEXT,
+    actual TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_phoneme_errors_learner_time
+    ON phoneme_errors (learner_id, created_at, kind, expected, actual);
+CREATE INDEX IF NOT EXISTS ix_phoneme_errors_result ON phoneme_errors (result_id);
+
+CREATE TABLE IF NOT EXISTS learner_daily (
+    learner_id TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    accuracy_sum REAL NOT NULL,
+    accuracy_n INTEGER NOT NULL,
+    speech_rate_sum REAL NOT NULL,
+    speech_rate_n INTEGER NOT NULL,
+    pause_sum INTEGER NOT NULL,
+    pause_n INTEGER NOT NULL,
+    error_sum INTEGER NOT NULL,
+    PRIMARY KEY (learner_id, day)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS learner_phoneme_stats (
+    learner_id TEXT NOT NULL,
+    phoneme TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    last_seen REAL NOT NULL,
+    PRIMARY KEY (learner_id, phoneme, kind)
+) WITHOUT ROWID;
+"""
+
+# calendar buckets (UTC) as SQLite date expressions over learner_daily.day;
+# weeks start on Monday: "weekday 0" moves to the next Sunday, then back 6 days
+BUCKET_DATES = {
+    "day": "date(day * 86400, 'unixepoch')",
+    "week": "date(day * 86400, 'unixepoch', 'weekday 0', '-6 days')",
+    "month": "date(day * 86400, 'unixepoch', 'start of month')",
+}
+
+_SUBSTITUTION = re.compile(r"Expected /(.+?)/ but got /(.+?)/")
+_MISSING = re.compile(r"Missing phoneme /(.+?)/")
+_UNEXPECTED = re.compile(r"Unexpected phoneme /(.+?)/")
+
+
+def parse_error(message: str) -> Optional[tuple]:
+    """Turn a scorer error_analysis string into (kind, expected, actual)."""
+    if m := _SUBSTITUTION.fullmatch(message):
+        return "substitution", m.group(1), m.group(2)
+    if m := _MISSING.fullmatch(message):
+        return "missing", m.group(1), None
+    if m := _UNEXPECTED.fullmatch(message):
+        return "unexpected", None, m.group(1)
+    return None
+
+
+def build_record(learner_id: str, reference_text: str, transcription: str,
+                 score_data: Dict[str, Any], created_at: Optional[float] = None,
+                 alignment_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Flatten a scoring-service response into a row for HistoryStore."""
+    fluency = score_data.get("fluency") or {}
+    errors = [e for e in (parse_error(msg) for msg in score_data.get("error_analysis") or []) if e]
+    return {
+        "learner_id": learner_id,
+        "created_at": created_at if created_at is not None else time.time(),
+        "reference_text": reference_text,
+        "transcription": transcription,
+        "accuracy": score_data.get("pronunciation_accuracy"),
+        "speech_rate": fluency.get("speech_rate"),
+        "pause_count": fluency.get("pause_count"),
+        "avg_phoneme_duration": fluency.get("avg_phoneme_duration"),
+        "errors": errors,
+        "alignment_data": alignment_data,
+    }
+
+
+class HistoryStore:
+    """
+    SQLite-backed store for analyze results.
+
+    Writes go through a queue drained by a single background thread, so the
+    request path only pays for a queue put. Each batch updates the raw tables
+    and the per-learner rollups (learner_daily, learner_phoneme_stats) in one
+    transaction; the trend endpoints read only the rollups.
+
+    With capture_path set, each committed record's alignment_data is also
+    appended there as a JSONL line whose "key" is its results.id.
+    """
+
+    def __init__(self, db_path: str = HISTORY_DB_PATH, capture_path: Optional[str] = ALIGNMENT_CAPTURE_PATH):
+        self.db_path = db_path
+        self.capture_path = capture_path
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self._local = threading.local()
+        self._writer: Optional[threading.Thread] = None
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30.0)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    # ---- writes -------------------------------------------------------
+
+    def start(self) -> None:
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+            self._writer.start()
+
+    def stop(self) -> None:
+        """Flush pending records and stop the writer thread."""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._writer = None
+
+    def submit(self, record: Dict[str, Any]) -> None:
+        """Queue a record built by build_record(); never blocks on disk."""
+        self._queue.put(record)
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                record = self._queue.get()
+                if record is None:
+                    break
+                batch = [record]
+                stop = False
+                while len(batch) < WRITE_BATCH_SIZE:
+                    try:
+                        record = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if record is None:
+                        stop = True
+                        break
+                    batch.append(record)
+                try:
+                    self.write_batch(batch, conn)
+                except Exception as e:
+                    logger.error(f"Failed to persist {len(batch)} history records: {e}")
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def write_batch(self, records: List[Dict[str, Any]], conn: Optional[sqlite3.Connection] = None) -> None:
+        """Insert records and update rollups in a single transaction."""
+        conn = conn or self._reader()
+        captured = []
+        with conn:
+            for r in records:
+                cur = conn.execute(
+                    "INSERT INTO results (learner_id, created_at, reference_text, transcription, accuracy,"
+                    " speech_rate, pause_count, avg_phoneme_duration, error_count)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (r["learner_id"], r["created_at"], r["reference_text"], r["transcription"],
+                     r["accuracy"], r["speech_rate"], r["pause_count"], r["avg_phoneme_duration"],
+                     len(r["errors"])),
+                )
+                result_id = cur.lastrowid
+                if r.get("alignment_data") is not None:
+                    captured.append({**r["alignment_data"], "key": str(result_id)})
+                conn.executemany(
+                    "INSERT INTO phoneme_errors (result_id, learner_id, created_at, kind, expected, actual)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    [(result_id, r["learner_id"], r["created_at"], kind, expected, actual)
+                     for kind, expected, actual in r["errors"]],
+                )
+                conn.execute(
+                    "INSERT INTO learner_daily VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (learner_id, day) DO UPDATE SET"
+                    " attempts = attempts + 1,"
+                    " accuracy_sum = accuracy_sum + excluded.accuracy_sum,"
+                    " accuracy_n = accuracy_n + excluded.accuracy_n,"
+                    " speech_rate_sum = speech_rate_sum + excluded.speech_rate_sum,"
+                    " speech_rate_n = speech_rate_n + excluded.speech_rate_n,"
+                    " pause_sum = pause_sum + excluded.pause_sum,"
+                    " pause_n = pause_n + excluded.pause_n,"
+                    " error_sum = error_sum + excluded.error_sum",
+                    # missing metrics are counted separately so they don't drag the averages down
+                    (r["learner_id"], int(r["created_at"] // 86400),
+                     r["accuracy"] or 0.0, int(r["accuracy"] is not None),
+                     r["speech_rate"] or 0.0, int(r["speech_rate"] is not None),
+                     r["pause_count"] or 0, int(r["pause_count"] is not None),
+                     len(r["errors"])),
+                )
+                conn.executemany(
+                    "INSERT INTO learner_phoneme_stats VALUES (?, ?, ?, 1, ?)"
+                    " ON CONFLICT (learner_id, phoneme, kind) DO UPDATE SET"
+                    " count = count + 1, last_seen = max(last_seen, excluded.last_seen)",
+                    [(r["learner_id"], expected if expected is not None else actual, kind, r["created_at"])
+                     for kind, expected, actual in r["errors"]],
+                )
+        # written after commit, so every captured key refers to a stored result
+        if self.capture_path and captured:
+            try:
+                with open(self.capture_path, "a", encoding="utf8") as f:
+                    f.write("".join(json.dumps(a, ensure_ascii=False) + "\n" for a in captured))
+            except OSError as e:
+                logger.error(f"Failed to capture {len(captured)} alignments to {self.capture_path}: {e}")
+
+    # ---- reads --------------------------------------------------------
+
+    def list_results(self, learner_id: str, limit: int = 20, before_id: Optional[int] = None,
+                     start: Optional[float] = None, end: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Newest-first page of results. Pagination is keyset-based on id, so
+        deep pages cost the same as the first one.
+        """
+        sql = "SELECT * FROM results WHERE learner_id = ?"
+        params: List[Any] = [learner_id]
+        if before_id is not None:
+            sql += (" AND (created_at, id) < ("
+                    "SELECT created_at, id FROM results WHERE id = ?)")
+            params.append(before_id)
+        if start is not None:
+            sql += " AND created_at >= ?"
+            params.append(start)
+        if end is not None:
+            sql += " AND created_at < ?"
+            params.append(end)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit)
+
+        conn = self._reader()
+        rows = [dict(row) for row in conn.execute(sql, params)]
+        if rows:
+            ids = [row["id"] for row in rows]
+            errors: Dict[int, List[dict]] = {i: [] for i in ids}
+            placeholders = ",".join("?" * len(ids))
+            for e in conn.execute(
+                f"SELECT result_id, kind, expected, actual FROM phoneme_errors WHERE result_id IN ({placeholders})",
+                ids,
+            ):
+                errors[e["result_id"]].append({"kind": e["kind"], "expected": e["expected"], "actual": e["actual"]})
+            for row in rows:
+                row["phoneme_errors"] = errors[row["id"]]
+
+        return {
+            "items": rows,
+            "next_before_id": rows[-1]["id"] if len(rows) == limit else None,
+        }
+
+    def trend(self, learner_id: str, bucket: str = "day",
+              start: Optional[float] = None, end: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Per-bucket averages served from the learner_daily rollup. Buckets are
+        UTC calendar days, Monday-based weeks or calendar months; start and
+        end are rounded to whole days, with end exclusive.
+        """
+        if bucket not in BUCKET_DATES:
+            raise ValueError(f"Unknown bucket: {bucket}")
+        sql = (
+            f"SELECT {BUCKET_DATES[bucket]} AS bucket_date, SUM(attempts) AS attempts,"
+            " SUM(accuracy_sum) AS accuracy_sum, SUM(accuracy_n) AS accuracy_n,"
+            " SUM(speech_rate_sum) AS speech_rate_sum, SUM(speech_rate_n) AS speech_rate_n,"
+            " SUM(pause_sum) AS pause_sum, SUM(pause_n) AS pause_n, SUM(error_sum) AS error_sum"
+            " FROM learner_daily WHERE learner_id = ?"
+        )
+        params: List[Any] = [learner_id]
+        if start is not None:
+            sql += " AND day >= ?"
+            params.append(int(start // 86400))
+        if end is not None:
+            # end is exclusive, as in list_results; a day counts if it starts before end
+            sql += " AND day * 86400 < ?"
+            params.append(end)
+        sql += " GROUP BY bucket_date ORDER BY bucket_date"
+
+        def avg(total, n):
+            return round(total / n, 4) if n else None
+
+        points = []
+        for row in self._reader().execute(sql, params):
+            attempts = row["attempts"]
+            points.append({
+                "bucket": row["bucket_date"],
+                "bucket_start": int(calendar.timegm(time.strptime(row["bucket_date"], "%Y-%m-%d"))),
+                "attempts": attempts,
+                "avg_accuracy": avg(row["accuracy_sum"], row["accuracy_n"]),
+                "avg_speech_rate": avg(row["speech_rate_sum"], row["speech_rate_n"]),
+                "avg_pause_count": avg(row["pause_sum"], row["pause_n"]),
+                "avg_error_count": avg(row["error_sum"], attempts),
+            })
+        return points
+
+    def phoneme_stats(self, learner_id: str, limit: int = 20,
+                      start: Optional[float] = None, end: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Most frequent phoneme errors for a learner. Without a time range this
+        reads the learner_phoneme_stats rollup; with one it aggregates the
+        indexed phoneme_errors table.
+        """
+        if start is None and end is None:
+            sql = ("SELECT phoneme, kind, count, last_seen FROM learner_phoneme_stats"
+                   " WHERE learner_id = ? ORDER BY count DESC LIMIT ?")
+            params: List[Any] = [learner_id, limit]
+        else:
+            sql = ("SELECT COALESCE(expected, actual) AS phoneme, kind, COUNT(*) AS count,"
+                   " MAX(created_at) AS last_seen FROM phoneme_errors WHERE learner_id = ?")
+            params = [learner_id]
+            if start is not None:
+                sql += " AND created_at >= ?"
+                params.append(start)
+            if end is not None:
+                sql += " AND created_at < ?"
+                params.append(end)
+            sql += " GROUP BY phoneme, kind ORDER BY count DESC LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self._reader().execute(sql, params)]
@@ -1,7 +1,18 @@
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+import asyncio
+import httpx
 import logging
-import requests 
+import os
+import threading
+import time
+from typing import Optional
+
+from app.history import HistoryStore, build_record
+from app.services.alignment import AlignmentService
+from app.services.asr import ASRService
+from app.services.scoring import ScoringService
 
 app = FastAPI()
 
@@ -16,12 +27,93 @@ app.add_middleware(
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-ASR_SERVICE_URL = "http://localhost:8001/transcribe"  
-ALIGNMENT_SERVICE_URL = "http://localhost:8002/align" 
-SCORING_SERVICE_URL = "http://localhost:8003/score"  
+ASR_SERVICE_URL = os.getenv("ASR_SERVICE_URL", "http://localhost:8001/transcribe")
+ALIGNMENT_SERVICE_URL = os.getenv("ALIGNMENT_SERVICE_URL", "http://localhost:8002/align")
+SCORING_SERVICE_URL = os.getenv("SCORING_SERVICE_URL", "http://localhost:8003/score")
+READINESS_URLS = {
+    "asr-service": ASR_SERVICE_URL.rsplit("/", 1)[0] + "/health/ready",
+    "alignment-service": ALIGNMENT_SERVICE_URL.rsplit("/", 1)[0] + "/health/ready",
+    "scoring-service": SCORING_SERVICE_URL.rsplit("/", 1)[0] + "/health/ready",
+}
+
+# services: 调用三个独立的 HTTP 服务（默认）
+# embedded: 在网关进程内直接运行 ASR、对齐和评分，适合单机小规模部署
+GATEWAY_MODE = os.getenv("GATEWAY_MODE", "services")
+
+if GATEWAY_MODE == "embedded":
+    from app.services.embedded import EmbeddedAlignmentService, EmbeddedASRService, EmbeddedScoringService
+    asr_service = EmbeddedASRService()
+    alignment_service = EmbeddedAlignmentService()
+    scoring_service = EmbeddedScoringService()
+else:
+    asr_service = ASRService(ASR_SERVICE_URL)
+    alignment_service = AlignmentService(ALIGNMENT_SERVICE_URL)
+    scoring_service = ScoringService(SCORING_SERVICE_URL)
+
+embedded_state = {"status": "starting", "error": None, "duration": None}
+
+history_store = HistoryStore()
+
+
+def _warm_up_embedded():
+    """嵌入模式下在后台预热各阶段，替代独立服务各自的预热"""
+    started = time.perf_counter()
+    try:
+        scoring_service.warm_up()
+        alignment_service.warm_up()
+        asr_service.warm_up()
+        embedded_state["status"] = "ready"
+    except Exception as e:
+        embedded_state.update(status="failed", error=str(e))
+        logger.error(f"Embedded warm-up failed: {e}")
+    finally:
+        embedded_state["duration"] = round(time.perf_counter() - started, 3)
+
+
+@app.on_event("startup")
+def start_history_writer():
+    history_store.start()
+    if GATEWAY_MODE == "embedded":
+        threading.Thread(target=_warm_up_embedded, name="embedded-warm-up", daemon=True).start()
+
+
+@app.on_event("shutdown")
+def stop_history_writer():
+    history_store.stop()
+
+
+@app.get("/health")
+@app.get("/health/live")
+async def health_check():
+    """存活检查：不访问下游服务"""
+    return {"status": "healthy", "service": "api-gateway"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """就绪检查：所有下游服务（嵌入模式下为本进程各阶段）完成预热后返回 200"""
+    if GATEWAY_MODE == "embedded":
+        ready = embedded_state["status"] == "ready"
+        return JSONResponse(status_code=200 if ready else 503, content={"mode": "embedded", **embedded_state})
+
+    async def probe(client, url):
+        try:
+            response = await client.get(url, timeout=2.0)
+            return response.status_code == 200
+        except httpx.HTTPError:
+            return False
+
+    async with httpx.AsyncClient() as client:
+        results = await asyncio.gather(*(probe(client, url) for url in READINESS_URLS.values()))
+    services = dict(zip(READINESS_URLS, results))
+    ready = all(results)
+    return JSONResponse(status_code=200 if ready else 503,
+                        content={"status": "ready" if ready else "starting", "services": services})
+
 
 @app.post("/api/v1/analyze")
-async def analyze_pronunciation(audio_file: UploadFile = File(...), text: str = Form(...)):
+async def analyze_pronunciation(audio_file: UploadFile = File(...), text: str = Form(...),
+                                learner_id: str = Form("anonymous")):
     try:
        
         if not audio_file or not text:
@@ -29,11 +121,7 @@ async def analyze_pronunciation(audio_file: UploadFile = File(...), text: str =
             raise HTTPException(status_code=422, detail="Missing audio file or reference text")
         
         audio_content = await audio_file.read()
-        asr_response = requests.post(ASR_SERVICE_URL, files={"file": audio_content},data={"text":text})
-      
-        if asr_response.status_code != 200:
-            raise HTTPException(status_code=asr_response.status_code, detail="Error transcribing audio")
-        asr_data = asr_response.json()
+        asr_data = await asr_service.transcribe(audio_content, text)
         transcription = None
         if isinstance(asr_data, dict) and "transcription" in asr_data:
             transcription = asr_data["transcription"]
@@ -52,26 +140,11 @@ async def analyze_pronunciation(audio_file: UploadFile = File(...), text: str =
         
         if not transcription:
             raise HTTPException(status_code=400, detail="No transcription returned from ASR service")
-        alignment_response = requests.post(
-            ALIGNMENT_SERVICE_URL,
-            files={"file": audio_content},
-            data={"text": transcription,"reftext":text}
-            
-        )
-
-        if alignment_response.status_code != 200:
-            raise HTTPException(status_code=alignment_response.status_code, detail="Error aligning phonemes")
-
-        alignment_data = alignment_response.json()
-        scoring_response = requests.post(
-            SCORING_SERVICE_URL,
-            json=alignment_data
-        )
-
-        if scoring_response.status_code != 200:
-            raise HTTPException(status_code=scoring_response.status_code, detail="Error scoring pronunciation")
-
-        score_data = scoring_response.json()
+        alignment_data = await alignment_service.align(audio_content, transcription, text)
+        score_data = await scoring_service.score(alignment_data)
+        history_store.submit(build_record(
+            learner_id, text, transcription, score_data,
+            alignment_data=alignment_data if history_store.capture_path else None))
 
         return {
             "transcription": transcription,
@@ -83,6 +156,39 @@ async def analyze_pronunciation(audio_file: UploadFile = File(...), text: str =
         logger.error(f"Error during analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/v1/history")
+def get_history(learner_id: str = "anonymous", limit: int = 20, before_id: Optional[int] = None,
+                start: Optional[float] = None, end: Optional[float] = None):
+    """
+    分页获取历史记录（按时间倒序）
+    next_before_id 作为下一页的 before_id 传入
+    """
+    if not 1 <= limit <= 200:
+        raise HTTPException(status_code=422, detail="limit must be between 1 and 200")
+    return history_store.list_results(learner_id, limit=limit, before_id=before_id, start=start, end=end)
+
+
+@app.get("/api/v1/history/trend")
+def get_history_trend(learner_id: str = "anonymous", bucket: str = "day",
+                      start: Optional[float] = None, end: Optional[float] = None):
+    """按天/周/月聚合的得分趋势"""
+    try:
+        return {"learner_id": learner_id, "bucket": bucket,
+                "points": history_store.trend(learner_id, bucket=bucket, start=start, end=end)}
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@app.get("/api/v1/history/phonemes")
+def get_history_phonemes(learner_id: str = "anonymous", limit: int = 20,
+                         start: Optional[float] = None, end: Optional[float] = None):
+    """最常见的音素错误统计"""
+    if not 1 <= limit <= 200:
+        raise HTTPException(status_code=422, detail="limit must be between 1 and 200")
+    return {"learner_id": learner_id,
+            "phonemes": history_store.phoneme_stats(learner_id, limit=limit, start=start, end=end)}
+
+
 @app.post("/api/v1/transcribe")
 async def transcribe(audio_file: UploadFile = File(...)):
     """
@@ -105,21 +211,8 @@ async def transcribe(audio_file: UploadFile = File(...)):
         if len(audio_content) == 0:
             raise HTTPException(status_code=422, detail="Empty audio file")
         
-        # 调用ASR服务进行转录
-        asr_response = requests.post(
-            ASR_SERVICE_URL, 
-            files={"file": ("audio.wav", audio_content, audio_file.content_type)},
-            data={"text": ""}  # 空文本，表示纯转录模式
-        )
-        
-        if asr_response.status_code != 200:
-            logger.error(f"ASR service error: {asr_response.status_code} - {asr_response.text}")
-            raise HTTPException(
-                status_code=asr_response.status_code, 
-                detail=f"Error transcribing audio: {asr_response.text}"
-            )
-        
-        asr_data = asr_response.json()
+        # 调用ASR服务进行转录（空文本，表示纯转录模式）
+        asr_data = await asr_service.transcribe(audio_content, "", "audio.wav", audio_file.content_type)
         
         # 提取转录结果
         transcription = None
@@ -148,7 +241,7 @@ async def transcribe(audio_file: UploadFile = File(...)):
     except HTTPException:
         # 重新抛出 HTTP 异常
         raise
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         logger.error(f"Request error when calling ASR service: {e}")
         raise HTTPException(status_code=503, detail="ASR service unavailable")
     except Exception as e:
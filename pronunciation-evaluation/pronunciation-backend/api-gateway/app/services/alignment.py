@@ -1,13 +1,19 @@
 import httpx
+from fastapi import HTTPException
 
 class AlignmentService:
-    async def align(self, audio_path, text, transcription):
+    def __init__(self, url="http://localhost:8002/align", timeout=120.0):
+        self.url = url
+        self.timeout = timeout
+
+    async def align(self, audio, transcription, reftext):
         async with httpx.AsyncClient() as client:
-            with open(audio_path, "rb") as audio_file:
-                response = await client.post(
-                    "http://localhost:8002/align",
-                    files={"file": audio_file},
-                    data={"text": text, "transcription": transcription},
-                    timeout=30.0
-                )
-                return response.json()
\ No newline at end of file
+            response = await client.post(
+                self.url,
+                files={"file": ("audio.wav", audio, "audio/wav")},
+                data={"text": transcription, "reftext": reftext},
+                timeout=self.timeout
+            )
+            if response.status_code != 200:
+                raise HTTPException(status_code=response.status_code, detail=f"Error aligning phonemes: {response.text}")
+            return response.json()
@@ -1,12 +1,19 @@
 import httpx
+from fastapi import HTTPException
 
 class ASRService:
-    async def transcribe(self, audio_path):
+    def __init__(self, url="http://localhost:8001/transcribe", timeout=120.0):
+        self.url = url
+        self.timeout = timeout
+
+    async def transcribe(self, audio, text="", filename="audio.wav", content_type="audio/wav"):
         async with httpx.AsyncClient() as client:
-            with open(audio_path, "rb") as audio_file:
-                response = await client.post(
-                    "http://localhost:8001/transcribe",
-                    files={"file": audio_file},
-                    timeout=30.0
-                )
-                return response.json()
\ No newline at end of file
+            response = await client.post(
+                self.url,
+                files={"file": (filename, audio, content_type)},
+                data={"text": text},
+                timeout=self.timeout
+            )
+            if response.status_code != 200:
+                raise HTTPException(status_code=response.status_code, detail=f"Error transcribing audio: {response.text}")
+            return response.json()
@@ -0,0 +1,109 @@
+"""
+Embedded stage implementations for single-process deployments.
+
+Same async interface as ASRService, AlignmentService and ScoringService,
+but backed by WhisperASR, PhonemeAligner and PronunciationScorer loaded
+into the gateway process. Alignment and scoring results are passed on as
+the dicts the stages produce, with no multipart, JSON or Pydantic round
+trip. Whisper inference and MFA run on thread pools so the event loop stays
+free: both release the GIL (torch kernels, MFA subprocess). Scoring takes
+well under a millisecond and runs inline.
+"""
+import asyncio
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from app.services.local import load_phoneme_aligner, load_pronunciation_scorer, load_whisper_asr
+
+EMBEDDED_ALIGN_WORKERS = int(os.getenv("EMBEDDED_ALIGN_WORKERS", "4"))
+
+
+class EmbeddedASRService:
+    def __init__(self, model_name="small"):
+        self.model_name = model_name
+        self._model = None
+        self._lock = threading.Lock()
+        # one Whisper model, so inference is serialized on a single thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedded-asr")
+
+    def _get_model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = load_whisper_asr()(self.model_name)
+        return self._model
+
+    def _transcribe_file(self, audio, filename):
+        suffix = os.path.splitext(filename)[1] or ".wav"
+        fd, path = tempfile.mkstemp(prefix="embedded_asr_", suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            return self._get_model().transcribe(path)
+        finally:
+            os.remove(path)
+
+    def warm_up(self):
+        self._get_model().warm_up()
+
+    async def transcribe(self, audio, text="", filename="audio.wav", content_type="audio/wav"):
+        # same contract as asr-service /transcribe: a reference text is echoed back
+        if text and text.strip():
+            return {
+                "transcription": text.strip(),
+                "source": "reference_text",
+                "language": "unknown",
+                "confidence": 1.0,
+                "message": "Using provided reference text"
+            }
+        if not audio:
+            raise HTTPException(status_code=400, detail="Empty audio file")
+
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(self._executor, self._transcribe_file, audio, filename)
+        if "error" in result:
+            raise HTTPException(status_code=500, detail=f"Transcription error: {result['error']}")
+        return {
+            "transcription": result.get("transcription", ""),
+            "source": "asr_model",
+            "language": result.get("language", "unknown"),
+            "confidence": result.get("confidence", 0.0),
+            "segments": result.get("segments", []),
+            "processing_info": result.get("processing_info", {})
+        }
+
+
+class EmbeddedAlignmentService:
+    def __init__(self, workers=EMBEDDED_ALIGN_WORKERS):
+        self._aligner = load_phoneme_aligner()()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embedded-align")
+
+    def warm_up(self):
+        self._aligner.warm_up()
+
+    async def align(self, audio, transcription, reftext):
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._executor, self._aligner.align_audio_with_text, audio, transcription, reftext
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error aligning phonemes: {e}")
+
+
+class EmbeddedScoringService:
+    def __init__(self):
+        self._scorer = load_pronunciation_scorer()()
+
+    def warm_up(self):
+        self._scorer.score({"alignment": [], "expected_phonemes": []})
+
+    async def score(self, alignment_data):
+        try:
+            return self._scorer.score(alignment_data)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error scoring pronunciation: {str(e)}")
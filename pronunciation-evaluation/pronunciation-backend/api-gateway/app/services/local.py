@@ -0,0 +1,53 @@
+"""
+In-process access to the ASR, alignment and scoring implementations.
+
+Every service ships its code as a top-level package named ``app``, so the
+modules are loaded by file path under unique names instead of through
+sys.path. Only the stage module itself is executed (and its own imports,
+e.g. torch for WhisperASR), never the service's FastAPI app.
+"""
+import importlib.util
+import os
+import sys
+import threading
+from pathlib import Path
+
+BACKEND_DIR = Path(os.getenv("PRONUNCIATION_BACKEND_DIR", Path(__file__).resolve().parents[3]))
+
+_load_lock = threading.Lock()
+# fully executed modules only; sys.modules holds a module while it is still running
+_loaded = {}
+
+
+def _load(service: str, relpath: str):
+    module_name = f"_{service.replace('-', '_')}_{Path(relpath).stem}"
+    module = _loaded.get(module_name)
+    if module is None:
+        with _load_lock:
+            module = _loaded.get(module_name)
+            if module is None:
+                path = BACKEND_DIR / service / relpath
+                spec = importlib.util.spec_from_file_location(module_name, path)
+                if spec is None:
+                    raise ImportError(f"Cannot load {path}")
+                module = importlib.util.module_from_spec(spec)
+                sys.modules[module_name] = module
+                try:
+                    spec.loader.exec_module(module)
+                except BaseException:
+                    del sys.modules[module_name]
+                    raise
+                _loaded[module_name] = module
+    return module
+
+
+def load_whisper_asr():
+    return _load("asr-service", "app/models/whisper_asr.py").WhisperASR
+
+
+def load_phoneme_aligner():
+    return _load("alignment-service", "app/aligner.py").PhonemeAligner
+
+
+def load_pronunciation_scorer():
+    return _load("scoring-service", "app/scorer.py").PronunciationScorer
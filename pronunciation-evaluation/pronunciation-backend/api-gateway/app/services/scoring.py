@@ -1,11 +1,18 @@
 import httpx
+from fastapi import HTTPException
 
 class ScoringService:
+    def __init__(self, url="http://localhost:8003/score", timeout=30.0):
+        self.url = url
+        self.timeout = timeout
+
     async def score(self, alignment_data):
         async with httpx.AsyncClient() as client:
             response = await client.post(
-                "http://localhost:8003/score",
+                self.url,
                 json=alignment_data,
-                timeout=30.0
+                timeout=self.timeout
             )
-            return response.json()
\ No newline at end of file
+            if response.status_code != 200:
+                raise HTTPException(status_code=response.status_code, detail=f"Error scoring pronunciation: {response.text}")
+            return response.json()
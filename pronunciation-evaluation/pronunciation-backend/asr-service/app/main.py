@@ -1,6 +1,10 @@
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
 import os
 import logging
+import threading
+import time
 from typing import Optional
 
 # 配置日志
@@ -9,43 +13,69 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="ASR Service", description="Automatic Speech Recognition Service")
 
-# 延迟加载模型，避免启动时错误
+# 延迟加载模型，避免启动时错误；whisper/torch 只在 app.models.whisper_asr 中导入
 asr_model = None
+_model_lock = threading.Lock()
+
+# 预热状态：starting -> ready / failed
+ASR_WARM_UP = os.getenv("ASR_WARM_UP", "1") != "0"
+warm_up_state = {"status": "starting", "error": None, "started_at": time.time(), "duration": None}
 
 def get_asr_model():
     """
-    获取ASR模型实例（延迟加载）
+    获取ASR模型实例（延迟加载，线程安全）
     """
     global asr_model
     if asr_model is None:
-        try:
-            from app.models.whisper_asr import WhisperASR
-            logger.info("Initializing ASR model...")
-            asr_model = WhisperASR()
-            logger.info("ASR model initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize ASR model: {e}")
-            raise HTTPException(status_code=503, detail=f"ASR service unavailable: {str(e)}")
+        with _model_lock:
+            if asr_model is None:
+                try:
+                    from app.models.whisper_asr import WhisperASR
+                    logger.info("Initializing ASR model...")
+                    asr_model = WhisperASR()
+                    logger.info("ASR model initialized successfully")
+                except Exception as e:
+                    logger.error(f"Failed to initialize ASR model: {e}")
+                    raise HTTPException(status_code=503, detail=f"ASR service unavailable: {str(e)}")
     return asr_model
 
-@app.get("/health")
-async def health_check():
-    """健康检查接口"""
+def _warm_up():
+    """后台加载模型并执行一次合成推理，使首个真实请求不再承担预热开销"""
+    started = time.perf_counter()
     try:
-        # 尝试获取模型状态
-        model = get_asr_model()
-        return {
-            "status": "healthy", 
-            "service": "asr-service",
-            "model_loaded": model is not None,
-            "device": getattr(model, 'device', 'unknown')
-        }
+        get_asr_model().warm_up()
+        warm_up_state["status"] = "ready"
+        logger.info(f"ASR warm-up finished in {time.perf_counter() - started:.1f}s")
     except Exception as e:
-        return {
-            "status": "unhealthy",
-            "service": "asr-service", 
-            "error": str(e)
-        }
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        warm_up_state.update(status="failed", error=detail)
+        logger.error(f"ASR warm-up failed: {detail}")
+    finally:
+        warm_up_state["duration"] = round(time.perf_counter() - started, 3)
+
+@app.on_event("startup")
+def start_warm_up():
+    if ASR_WARM_UP:
+        threading.Thread(target=_warm_up, name="asr-warm-up", daemon=True).start()
+    else:
+        warm_up_state["status"] = "ready"
+
+@app.get("/health")
+@app.get("/health/live")
+async def health_check():
+    """存活检查接口：不加载模型，始终快速返回"""
+    return {
+        "status": "healthy",
+        "service": "asr-service",
+        "model_loaded": asr_model is not None,
+        "device": getattr(asr_model, 'device', 'unknown')
+    }
+
+@app.get("/health/ready")
+async def readiness_check():
+    """就绪检查接口：模型加载并完成预热前返回 503"""
+    body = {"service": "asr-service", **warm_up_state}
+    return JSONResponse(status_code=200 if warm_up_state["status"] == "ready" else 503, content=body)
 
 @app.post("/transcribe")
 async def transcribe_audio(file: UploadFile = File(...), text: Optional[str] = Form(None)):
@@ -87,12 +117,13 @@ async def transcribe_audio(file: UploadFile = File(...), text: Optional[str] = F
                 "message": "Using provided reference text"
             }
         else:
-            # 获取ASR模型
-            model = get_asr_model()
-            
-            # 进行语音识别
+            # 预热期间直接返回 503，而不是在事件循环上等待模型加载锁
+            if warm_up_state["status"] == "starting":
+                raise HTTPException(status_code=503, detail="ASR model is warming up, retry later")
+
+            # 模型加载与推理都是阻塞操作，放到线程池中执行，保证 /health/live 始终可响应
             logger.info(f"Transcribing audio file: {file.filename}")
-            result = model.transcribe(temp_path)
+            result = await run_in_threadpool(lambda: get_asr_model().transcribe(temp_path))
             
             logger.info(f"Transcription result: {result.get('transcription', 'No transcription')}")
             
@@ -49,6 +49,18 @@ class WhisperASR:
         else:
             return "cpu"
     
+    def warm_up(self):
+        """
+        用一秒静音执行一次推理，完成首次调用的内核初始化
+        """
+        import numpy as np
+
+        silence = np.zeros(16000, dtype=np.float32)
+        with warnings.catch_warnings():
+            warnings.filterwarnings("ignore")
+            self.model.transcribe(silence, language="en", fp16=self.device == "cuda",
+                                  temperature=0.0, verbose=None)
+    
     def transcribe(self, audio_path):
         """
         转录音频文件
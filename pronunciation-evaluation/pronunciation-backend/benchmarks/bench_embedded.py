@@ -0,0 +1,130 @@
+"""
+Compare /api/v1/analyze latency and memory: four services vs embedded gateway.
+
+    cd pronunciation-backend
+    python benchmarks/bench_embedded.py --audio sample.wav --text "hello world" --requests 50
+
+"services" starts asr-, alignment- and scoring-service plus the gateway as
+four uvicorn processes. "embedded" starts only the gateway with
+GATEWAY_MODE=embedded. Each layout is warmed up (waits for /health/ready and
+sends one request) before timing. Memory is the summed resident set size
+of the layout's processes, read from /proc (Linux only). It is measured
+after the run, with the peak (VmHWM) alongside. MFA subprocesses are not
+counted in either layout.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from common import free_port, post_multipart, start_service, stop_services
+
+
+def _wait_ready(base, timeout, procs):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if any(p.poll() is not None for p in procs):
+            raise RuntimeError("a service exited during startup")
+        try:
+            with urllib.request.urlopen(base + "/health/ready", timeout=2.0) as resp:
+                if resp.status == 200:
+                    return
+        except (urllib.error.URLError, OSError):
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{base} not ready after {timeout}s")
+
+
+def _rss_kb(pid, field):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _analyze(url, audio, text):
+    status, seconds = post_multipart(url, {"text": text, "learner_id": "bench"}, {"audio_file": ("a.wav", audio)})
+    if status != 200:
+        raise RuntimeError(f"analyze returned {status}")
+    return seconds
+
+
+def run_layout(layout, args, audio):
+    env = {**os.environ, "HISTORY_DB_PATH": os.path.join(tempfile.gettempdir(), f"bench_{layout}_history.db")}
+    procs = []
+    gateway_port = free_port()
+    try:
+        if layout == "services":
+            ports = {name: free_port() for name in ("asr-service", "alignment-service", "scoring-service")}
+            env.update(
+                GATEWAY_MODE="services",
+                ASR_SERVICE_URL=f"http://127.0.0.1:{ports['asr-service']}/transcribe",
+                ALIGNMENT_SERVICE_URL=f"http://127.0.0.1:{ports['alignment-service']}/align",
+                SCORING_SERVICE_URL=f"http://127.0.0.1:{ports['scoring-service']}/score",
+            )
+            procs += [start_service(name, port, env) for name, port in ports.items()]
+        else:
+            env["GATEWAY_MODE"] = "embedded"
+        procs.append(start_service("api-gateway", gateway_port, env))
+
+        base = f"http://127.0.0.1:{gateway_port}"
+        _wait_ready(base, args.ready_timeout, procs)
+        url = base + "/api/v1/analyze"
+        _analyze(url, audio, args.text)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            latencies = sorted(pool.map(lambda _: _analyze(url, audio, args.text), range(args.requests)))
+        wall = time.perf_counter() - started
+
+        rss = [_rss_kb(p.pid, "VmRSS") for p in procs]
+        peak = [_rss_kb(p.pid, "VmHWM") for p in procs]
+        return {
+            "layout": layout,
+            "processes": len(procs),
+            "p50": statistics.median(latencies),
+            "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            "mean": statistics.fmean(latencies),
+            "throughput": args.requests / wall,
+            "rss_mb": sum(rss) / 1024 if None not in rss else None,
+            "peak_mb": sum(peak) / 1024 if None not in peak else None,
+        }
+    finally:
+        stop_services(procs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--audio", required=True, help="16 kHz mono WAV to analyze")
+    parser.add_argument("--text", required=True, help="reference text for the recording")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--layout", choices=["both", "services", "embedded"], default="both")
+    parser.add_argument("--ready-timeout", type=float, default=600.0)
+    args = parser.parse_args()
+
+    with open(args.audio, "rb") as f:
+        audio = f.read()
+
+    layouts = ["services", "embedded"] if args.layout == "both" else [args.layout]
+    results = [run_layout(layout, args, audio) for layout in layouts]
+
+    def mb(v):
+        return "   n/a" if v is None else f"{v:7.0f} MB"
+
+    print(f"{'layout':<10} {'procs':>5} {'p50':>10} {'p95':>10} {'mean':>10} {'req/s':>7} {'rss':>10} {'peak':>10}")
+    for r in results:
+        print(f"{r['layout']:<10} {r['processes']:>5} {r['p50'] * 1000:8.1f}ms {r['p95'] * 1000:8.1f}ms "
+              f"{r['mean'] * 1000:8.1f}ms {r['throughput']:7.2f} {mb(r['rss_mb'])} {mb(r['peak_mb'])}")
+
+
+if __name__ == "__main__":
+    main()
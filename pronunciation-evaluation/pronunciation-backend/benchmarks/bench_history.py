@@ -0,0 +1,121 @@
+"""
+Query-latency benchmark for the history store.
+
+    cd pronunciation-backend
+    python benchmarks/bench_history.py --rows 2000000 --learners 5000
+
+Loads synthetic results into a fresh SQLite file through HistoryStore.write_batch
+and reports p50/p95 latency of the paginated history, trend and phoneme queries.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from common import load_service_module
+
+history = load_service_module("api-gateway", "app/history.py")
+HistoryStore, build_record = history.HistoryStore, history.build_record
+
+PHONEMES = ["AA1", "AE1", "AH0", "AO1", "B", "CH", "D", "DH", "EH1", "ER0", "F", "G", "HH", "IH0",
+            "IY1", "JH", "K", "L", "M", "N", "NG", "OW1", "P", "R", "S", "SH", "T", "TH", "UW1", "V",
+            "W", "Y", "Z", "ZH"]
+DAY = 86400
+
+
+def synthetic_score(rng):
+    errors = []
+    for _ in range(rng.randint(0, 4)):
+        roll = rng.random()
+        if roll < 0.6:
+            errors.append(f"Expected /{rng.choice(PHONEMES)}/ but got /{rng.choice(PHONEMES)}/")
+        elif roll < 0.8:
+            errors.append(f"Missing phoneme /{rng.choice(PHONEMES)}/")
+        else:
+            errors.append(f"Unexpected phoneme /{rng.choice(PHONEMES)}/")
+    return {
+        "pronunciation_accuracy": round(rng.random(), 2),
+        "fluency": {"speech_rate": round(rng.uniform(5, 15), 2), "pause_count": rng.randint(0, 5),
+                    "avg_phoneme_duration": round(rng.uniform(0.05, 0.2), 3)},
+        "error_analysis": errors,
+    }
+
+
+def load(store, rows, learners, days, seed):
+    rng = random.Random(seed)
+    now = time.time()
+    batch_size = 10000
+    started = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        batch = [
+            build_record(f"learner-{rng.randrange(learners)}", "the quick brown fox", "the quick brown fox",
+                         synthetic_score(rng), created_at=now - rng.random() * days * DAY)
+            for _ in range(min(batch_size, rows - offset))
+        ]
+        store.write_batch(batch)
+    elapsed = time.perf_counter() - started
+    print(f"loaded {rows} results in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+
+def measure(name, fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{name:<28} p50={statistics.median(samples):7.3f} ms  p95={p95:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--learners", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", help="reuse an existing database instead of loading a fresh one")
+    args = parser.parse_args()
+
+    tmp = None
+    if args.db:
+        store = HistoryStore(args.db)
+    else:
+        tmp = tempfile.TemporaryDirectory(prefix="history_bench_")
+        store = HistoryStore(os.path.join(tmp.name, "history.db"))
+        load(store, args.rows, args.learners, args.days, args.seed)
+
+    rng = random.Random(args.seed + 1)
+    now = time.time()
+
+    def learner():
+        return f"learner-{rng.randrange(args.learners)}"
+
+    def deep_page():
+        lid = learner()
+        page = store.list_results(lid, limit=20)
+        for _ in range(3):
+            if page["next_before_id"] is None:
+                break
+            page = store.list_results(lid, limit=20, before_id=page["next_before_id"])
+
+    measure("history first page", lambda: store.list_results(learner(), limit=20), args.repeat)
+    measure("history 4th page", deep_page, args.repeat)
+    measure("history last 30 days", lambda: store.list_results(learner(), limit=20, start=now - 30 * DAY),
+            args.repeat)
+    measure("trend by day", lambda: store.trend(learner(), bucket="day"), args.repeat)
+    measure("trend by week, 90 days", lambda: store.trend(learner(), bucket="week", start=now - 90 * DAY),
+            args.repeat)
+    measure("phoneme stats (rollup)", lambda: store.phoneme_stats(learner()), args.repeat)
+    measure("phoneme stats, 30 days", lambda: store.phoneme_stats(learner(), start=now - 30 * DAY),
+            args.repeat)
+
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
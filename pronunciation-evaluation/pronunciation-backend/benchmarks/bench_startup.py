@@ -0,0 +1,210 @@
+"""
+Import-time and first-request latency benchmark for the backend services.
+
+    cd pronunciation-backend
+    python benchmarks/bench_startup.py                  # all services
+    python benchmarks/bench_startup.py scoring-service --no-serve
+    python benchmarks/bench_startup.py --check          # exit 1 on regression
+
+For each service this measures
+
+  * import time of app.main in a fresh interpreter (best of --repeat), and
+    which heavy modules the import pulls in;
+  * with uvicorn: time until /health/live answers, time until /health/ready
+    answers 200 (warm-up done), and latency of the first real request:
+    /transcribe on a generated one-second WAV with no text (so Whisper
+    runs), /align on $ALIGNMENT_WARM_UP_AUDIO and $ALIGNMENT_WARM_UP_TEXT
+    (skipped unless that clip is set and `mfa` is on PATH), /score, and the
+    gateway's history query.
+
+--check fails when an import or first request exceeds its budget, a first
+request does not answer 200, or an import loads a module that must stay
+off the import path (torch, whisper, nltk, ...).
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import BACKEND_DIR, SCORE_PAYLOAD, free_port, make_wav, post_multipart, request, start_service, stop_services
+
+# keep the gateway's history database out of the source tree
+ENV = {**os.environ, "HISTORY_DB_PATH": os.path.join(tempfile.gettempdir(), "bench_startup_history.db")}
+
+
+def _timed(method, url, body=None):
+    started = time.perf_counter()
+    status = request(method, url, body)
+    return status, time.perf_counter() - started
+
+
+def first_transcribe(base):
+    return post_multipart(base + "/transcribe", {}, {"file": ("bench.wav", make_wav())}), None
+
+
+def first_align(base):
+    if not shutil.which("mfa"):
+        return None, "skipped, mfa not on PATH"
+    # MFA needs real speech that matches the text; a synthetic tone would just fail to align
+    audio_path = os.getenv("ALIGNMENT_WARM_UP_AUDIO")
+    if not audio_path:
+        return None, "skipped, set ALIGNMENT_WARM_UP_AUDIO to a speech clip"
+    with open(audio_path, "rb") as f:
+        audio = f.read()
+    text = os.getenv("ALIGNMENT_WARM_UP_TEXT", "hello world")
+    return post_multipart(base + "/align", {"text": text, "reftext": text}, {"file": ("bench.wav", audio)}), None
+
+
+def first_score(base):
+    return _timed("POST", base + "/score", SCORE_PAYLOAD), None
+
+
+def first_history(base):
+    return _timed("GET", base + "/api/v1/history?learner_id=bench"), None
+
+
+# name -> budgets (s), modules that must not be imported, first request (base url -> ((status, s) | None, note))
+SERVICES = {
+    "asr-service": {
+        "import_budget": 1.5,
+        "first_request_budget": 10.0,
+        "forbidden": ["torch", "whisper", "transformers"],
+        "first_request": first_transcribe,
+    },
+    "alignment-service": {
+        "import_budget": 1.5,
+        "first_request_budget": 30.0,
+        "forbidden": ["nltk"],
+        "first_request": first_align,
+    },
+    "scoring-service": {
+        "import_budget": 1.0,
+        "first_request_budget": 0.5,
+        "forbidden": ["scipy", "sklearn"],
+        "first_request": first_score,
+    },
+    "api-gateway": {
+        "import_budget": 1.5,
+        "first_request_budget": 0.5,
+        "forbidden": ["torch", "whisper", "nltk"],
+        "first_request": first_history,
+    },
+}
+
+IMPORT_PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - t
+print(json.dumps({"seconds": elapsed, "modules": sorted({m.split('.')[0] for m in sys.modules})}))
+"""
+
+
+def measure_import(service_dir, repeat):
+    samples, modules = [], []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-c", IMPORT_PROBE], cwd=service_dir, env=ENV,
+                              capture_output=True, text=True)
+        if proc.returncode:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        samples.append(result["seconds"])
+        modules = result["modules"]
+    return min(samples), statistics.median(samples), modules
+
+
+def _wait_for(url, expect_status, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            if request("GET", url, timeout=1.0) in expect_status:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.02)
+    return False
+
+
+def measure_serving(service, first_request, ready_timeout):
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    proc = start_service(service, port, ENV)
+    try:
+        deadline = started + ready_timeout
+        if not _wait_for(base + "/health/live", {200}, deadline):
+            return {"live": None, "ready": None, "first_request": None, "note": "never became live"}
+        live = time.perf_counter() - started
+        ready = time.perf_counter() - started if _wait_for(base + "/health/ready", {200}, deadline) else None
+
+        result, note = first_request(base)
+        status, first = result if result else (None, None)
+        return {"live": live, "ready": ready, "first_request": first, "first_status": status, "note": note}
+    finally:
+        stop_services([proc])
+
+
+def _fmt(seconds):
+    return "   n/a" if seconds is None else f"{seconds * 1000:8.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("services", nargs="*", help=f"subset of: {', '.join(SERVICES)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-serve", action="store_true", help="only measure import time")
+    parser.add_argument("--ready-timeout", type=float, default=300.0)
+    parser.add_argument("--check", action="store_true", help="exit 1 if a budget or import rule is violated")
+    args = parser.parse_args()
+    unknown = set(args.services) - set(SERVICES)
+    if unknown:
+        parser.error(f"unknown services: {', '.join(sorted(unknown))}")
+
+    failures = []
+    for name in args.services or SERVICES:
+        spec = SERVICES[name]
+        service_dir = os.path.join(BACKEND_DIR, name)
+        print(f"== {name}")
+        try:
+            best, median, modules = measure_import(service_dir, args.repeat)
+        except RuntimeError as e:
+            print(f"  import failed: {e}")
+            failures.append(f"{name}: import failed")
+            continue
+        heavy = [m for m in spec["forbidden"] if m in modules]
+        print(f"  import app.main     best {_fmt(best)}  median {_fmt(median)}  budget {_fmt(spec['import_budget'])}")
+        if heavy:
+            print(f"  heavy modules on import path: {', '.join(heavy)}")
+            failures.append(f"{name}: imports {', '.join(heavy)}")
+        if best > spec["import_budget"]:
+            failures.append(f"{name}: import took {best:.2f}s (budget {spec['import_budget']}s)")
+
+        if not args.no_serve:
+            r = measure_serving(name, spec["first_request"], args.ready_timeout)
+            print(f"  /health/live after  {_fmt(r['live'])}")
+            print(f"  /health/ready after {_fmt(r['ready'])}")
+            if r["first_request"] is None:
+                print(f"  first request       {r['note']}")
+                if r["live"] is None:
+                    failures.append(f"{name}: {r['note']}")
+                continue
+            print(f"  first request       {_fmt(r['first_request'])}  (status {r['first_status']})  "
+                  f"budget {_fmt(spec['first_request_budget'])}")
+            if r["first_status"] != 200:
+                failures.append(f"{name}: first request returned {r['first_status']}")
+            if r["first_request"] > spec["first_request_budget"]:
+                failures.append(f"{name}: first request took {r['first_request']:.2f}s "
+                                f"(budget {spec['first_request_budget']}s)")
+
+    if failures:
+        print("\nRegressions:\n  " + "\n  ".join(failures))
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
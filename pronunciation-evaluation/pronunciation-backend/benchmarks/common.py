@@ -0,0 +1,106 @@
+"""
+Helpers shared by the benchmark scripts: ports, uvicorn processes, HTTP
+requests without third-party clients, synthetic request payloads, and
+in-process access to service modules.
+"""
+import importlib.util
+import io
+import json
+import math
+import os
+import socket
+import struct
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+import uuid
+import wave
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the same alignment scoring-service scores during its own warm-up
+with open(os.path.join(BACKEND_DIR, "scoring-service", "app", "warm_up_alignment.json")) as f:
+    SCORE_PAYLOAD = json.load(f)
+
+
+def load_service_module(service, relpath):
+    """
+    Load one module of a service by file path. Every service's package is
+    named ``app``, so they cannot share sys.path; the module must only use
+    the standard library or already installed packages.
+    """
+    name = f"_bench_{service.replace('-', '_')}_{os.path.splitext(os.path.basename(relpath))[0]}"
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BACKEND_DIR, service, relpath))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_service(service, port, env):
+    """Start ``uvicorn app.main:app`` for one service directory."""
+    return subprocess.Popen([sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+                            cwd=os.path.join(BACKEND_DIR, service), env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def stop_services(procs):
+    for proc in procs:
+        proc.terminate()
+    for proc in procs:
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def _send(req, timeout):
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def request(method, url, body=None, timeout=30.0):
+    """Send an optional JSON body; returns the HTTP status."""
+    data = json.dumps(body).encode() if body is not None else None
+    return _send(urllib.request.Request(url, data=data, method=method,
+                                        headers={"Content-Type": "application/json"}), timeout)
+
+
+def post_multipart(url, fields, files, timeout=600.0):
+    """POST form ``fields`` and ``files`` ({name: (filename, bytes)}); returns (status, seconds)."""
+    boundary = uuid.uuid4().hex
+    parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+             for name, value in fields.items()]
+    for name, (filename, content) in files.items():
+        parts += [f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                  f"Content-Type: audio/wav\r\n\r\n".encode(), content, b"\r\n"]
+    parts.append(f"--{boundary}--\r\n".encode())
+    req = urllib.request.Request(url, data=b"".join(parts), method="POST",
+                                 headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    started = time.perf_counter()
+    status = _send(req, timeout)
+    return status, time.perf_counter() - started
+
+
+def make_wav(seconds=1.0, rate=16000, freq=220.0):
+    """A quiet sine tone as 16 kHz mono PCM16 WAV bytes."""
+    samples = [int(3000 * math.sin(2 * math.pi * freq * n / rate)) for n in range(int(seconds * rate))]
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+    return buf.getvalue()
@@ -0,0 +1,255 @@
+"""
+Compact, memory-mappable archive of phoneme alignments.
+
+An archive holds many alignment_data dicts (the output of
+PhonemeAligner.align_audio_with_text, i.e. the /score payload) as flat
+little-endian column arrays plus one interned string table, so a reader can
+mmap the file and rebuild any record without parsing the rest:
+
+    header   magic "PALN", version, section count, (offset, count) per section
+    records  key, word offsets, expected-phoneme offsets
+    words    text, start, end, phone offsets
+    phones   symbol, start, end
+    expected symbol
+    strings  offsets + utf-8 blob
+
+Offset columns hold n + 1 prefix sums, so record i spans
+[offsets[i], offsets[i + 1]). Each section starts on an 8-byte boundary and
+can also be loaded with numpy.frombuffer. A record's key is the input
+line's "key" field (the gateway's ALIGNMENT_CAPTURE_PATH writes the history
+results.id there) and is carried through to rescore output.
+
+    python -m app.archive pack alignments.jsonl alignments.pal
+    python -m app.archive info alignments.pal
+"""
+import argparse
+import json
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+MAGIC = b"PALN"
+VERSION = 1
+
+# (name, array typecode)
+SECTIONS = [
+    ("record_key", "I"),
+    ("record_word_offset", "I"),
+    ("record_expected_offset", "I"),
+    ("word_text", "I"),
+    ("word_start", "d"),
+    ("word_end", "d"),
+    ("word_phone_offset", "I"),
+    ("phone_symbol", "I"),
+    ("phone_start", "d"),
+    ("phone_end", "d"),
+    ("expected_symbol", "I"),
+    ("string_offset", "I"),
+    ("string_blob", "B"),
+]
+
+_HEADER = struct.Struct("<4sHH")
+_SECTION_ENTRY = struct.Struct("<QQ")
+_HEADER_SIZE = _HEADER.size + _SECTION_ENTRY.size * len(SECTIONS)
+
+
+def _align8(n: int) -> int:
+    return (n + 7) & ~7
+
+
+class ArchiveWriter:
+    """Collects alignments in memory and writes the archive on close()."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._columns = {name: array(code) for name, code in SECTIONS}
+        self._strings: Dict[str, int] = {}
+        self._columns["record_word_offset"].append(0)
+        self._columns["record_expected_offset"].append(0)
+        self._columns["word_phone_offset"].append(0)
+        self._columns["string_offset"].append(0)
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+
+    def __len__(self) -> int:
+        return len(self._columns["record_key"])
+
+    def _intern(self, s: str) -> int:
+        idx = self._strings.get(s)
+        if idx is None:
+            idx = self._strings[s] = len(self._strings)
+            self._columns["string_blob"].frombytes(s.encode("utf8"))
+            self._columns["string_offset"].append(len(self._columns["string_blob"]))
+        return idx
+
+    def add(self, alignment_data: Dict[str, Any], key: Optional[str] = None) -> None:
+        """Append one alignment_data dict; key defaults to the record index."""
+        c = self._columns
+        if key is None:
+            key = alignment_data.get("key", str(len(self)))
+        for word in alignment_data.get("alignment", []):
+            if "phonemes" not in word:
+                raise ValueError(f"Missing phonemes in word: {word}")
+            c["word_text"].append(self._intern(word.get("word", "")))
+            c["word_start"].append(float(word.get("start", 0)))
+            c["word_end"].append(float(word.get("end", 0)))
+            for p in word["phonemes"]:
+                c["phone_symbol"].append(self._intern(p["phoneme"]))
+                c["phone_start"].append(float(p["start"]))
+                c["phone_end"].append(float(p["end"]))
+            c["word_phone_offset"].append(len(c["phone_symbol"]))
+        for symbol in alignment_data.get("expected_phonemes", []):
+            c["expected_symbol"].append(self._intern(symbol))
+        c["record_key"].append(self._intern(str(key)))
+        c["record_word_offset"].append(len(c["word_text"]))
+        c["record_expected_offset"].append(len(c["expected_symbol"]))
+
+    def close(self) -> None:
+        entries = []
+        offset = _align8(_HEADER_SIZE)
+        for name, _ in SECTIONS:
+            column = self._columns[name]
+            entries.append((offset, len(column)))
+            offset = _align8(offset + len(column) * column.itemsize)
+
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(SECTIONS)))
+            for entry in entries:
+                f.write(_SECTION_ENTRY.pack(*entry))
+            for (name, _), (section_offset, _) in zip(SECTIONS, entries):
+                f.write(b"\0" * (section_offset - f.tell()))
+                column = self._columns[name]
+                if sys.byteorder != "little" and column.itemsize > 1:
+                    column = array(column.typecode, column)
+                    column.byteswap()
+                column.tofile(f)
+        tmp.replace(self.path)
+
+
+class ArchiveReader:
+    """Random access to an archive through mmap; records are rebuilt on demand."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, n_sections = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"Not an alignment archive: {self.path}")
+        if version != VERSION or n_sections != len(SECTIONS):
+            raise ValueError(f"Unsupported archive version {version} in {self.path}")
+
+        self._view = view = memoryview(self._mm)
+        for i, (name, code) in enumerate(SECTIONS):
+            offset, count = _SECTION_ENTRY.unpack_from(self._mm, _HEADER.size + i * _SECTION_ENTRY.size)
+            size = array(code).itemsize
+            section = view[offset:offset + count * size]
+            if sys.byteorder != "little" and size > 1:
+                column = array(code, section.tobytes())
+                column.byteswap()
+                section = memoryview(column)
+            elif code != "B":
+                section = section.cast(code)
+            setattr(self, "_" + name, section)
+
+        self._strings: Dict[int, str] = {}
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for name, _ in SECTIONS:
+            section = getattr(self, "_" + name, None)
+            if isinstance(section, memoryview):
+                section.release()
+        self._view.release()
+        self._mm.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return len(self._record_key)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def _string(self, idx: int) -> str:
+        s = self._strings.get(idx)
+        if s is None:
+            start, end = self._string_offset[idx], self._string_offset[idx + 1]
+            s = self._strings[idx] = bytes(self._string_blob[start:end]).decode("utf8")
+        return s
+
+    def key(self, i: int) -> str:
+        # keys are unique per record, so they bypass the symbol cache
+        idx = self._record_key[i]
+        start, end = self._string_offset[idx], self._string_offset[idx + 1]
+        return bytes(self._string_blob[start:end]).decode("utf8")
+
+    def __getitem__(self, i: int) -> Dict[str, Any]:
+        """Return record i in the alignment_data shape PronunciationScorer.score expects."""
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        s = self._string
+        alignment: List[dict] = []
+        for w in range(self._record_word_offset[i], self._record_word_offset[i + 1]):
+            alignment.append({
+                "word": s(self._word_text[w]),
+                "start": self._word_start[w],
+                "end": self._word_end[w],
+                "phonemes": [
+                    {"phoneme": s(self._phone_symbol[p]), "start": self._phone_start[p], "end": self._phone_end[p]}
+                    for p in range(self._word_phone_offset[w], self._word_phone_offset[w + 1])
+                ],
+            })
+        expected = [s(self._expected_symbol[e])
+                    for e in range(self._record_expected_offset[i], self._record_expected_offset[i + 1])]
+        return {"key": self.key(i), "alignment": alignment, "expected_phonemes": expected}
+
+
+def pack(jsonl_path: Union[str, Path], archive_path: Union[str, Path]) -> int:
+    """Pack a JSONL file of alignment_data dicts (one per line) into an archive."""
+    with open(jsonl_path, encoding="utf8") as src, ArchiveWriter(archive_path) as writer:
+        for line in src:
+            if line.strip():
+                writer.add(json.loads(line))
+        return len(writer)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Alignment archive tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("pack", help="pack a JSONL file of /align responses into an archive")
+    p.add_argument("jsonl")
+    p.add_argument("archive")
+    p = sub.add_parser("info", help="print archive statistics")
+    p.add_argument("archive")
+    args = parser.parse_args(argv)
+
+    if args.command == "pack":
+        count = pack(args.jsonl, args.archive)
+        print(f"Packed {count} alignments into {args.archive} ({Path(args.archive).stat().st_size} bytes)")
+    else:
+        with ArchiveReader(args.archive) as reader:
+            print(f"records: {len(reader)}")
+            print(f"words: {len(reader._word_text)}")
+            print(f"phones: {len(reader._phone_symbol)}")
+            print(f"strings: {len(reader._string_offset) - 1}")
+            print(f"bytes: {reader.path.stat().st_size}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,17 @@
+import json
+from pathlib import Path
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 from app.scorer import PronunciationScorer 
 
 app = FastAPI()
 scorer = PronunciationScorer()
+warm_up_state = {"status": "starting", "error": None}
+
+# synthetic request scored at startup; benchmarks/common.py sends the same payload
+WARM_UP_ALIGNMENT = json.loads((Path(__file__).parent / "warm_up_alignment.json").read_text())
 
 class PhonemeData(BaseModel):
     phoneme: str
@@ -22,6 +29,26 @@ class AlignmentData(BaseModel):
     expected_phonemes: List[str]
     alignment_textgrid_path: Optional[str] = None
 
+@app.on_event("startup")
+def warm_up():
+    # scoring is cheap, so the synthetic request runs inline before the first real one
+    try:
+        AlignmentData(**WARM_UP_ALIGNMENT)
+        scorer.score(WARM_UP_ALIGNMENT)
+        warm_up_state["status"] = "ready"
+    except Exception as e:
+        warm_up_state.update(status="failed", error=str(e))
+
+@app.get("/health")
+@app.get("/health/live")
+async def health_check():
+    return {"status": "healthy", "service": "scoring-service"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    body = {"service": "scoring-service", **warm_up_state}
+    return JSONResponse(status_code=200 if warm_up_state["status"] == "ready" else 503, content=body)
+
 @app.post("/score")
 async def score_pronunciation(data: AlignmentData):
     try:
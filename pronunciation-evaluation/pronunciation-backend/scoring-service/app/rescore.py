@@ -0,0 +1,130 @@
+"""
+Re-score an alignment archive offline with PronunciationScorer.
+
+    python -m app.rescore alignments.pal -o scores.jsonl --workers 8
+
+Records are scored in chunks across a process pool; every worker mmaps the
+archive itself, so only chunk indices and result lines cross process
+boundaries. Results are written to the output JSONL in archive order and
+flushed per chunk. Each line is {"index", "key", **score}; key is the
+record's archive key, so scores join back to their source (the history
+results.id for gateway captures). Re-running the same command resumes
+after the last complete line. Use "-o -" to stream to stdout (no resume).
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from app.archive import ArchiveReader
+from app.scorer import PronunciationScorer
+
+_reader: Optional[ArchiveReader] = None
+_scorer: Optional[PronunciationScorer] = None
+
+
+def _init_worker(archive_path: str, pause_threshold: float) -> None:
+    global _reader, _scorer
+    # Ctrl-C is handled by the parent, which cancels pending chunks
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _reader = ArchiveReader(archive_path)
+    _scorer = PronunciationScorer(pause_threshold=pause_threshold)
+
+
+def _score_chunk(bounds: Tuple[int, int]) -> List[str]:
+    lines = []
+    for i in range(*bounds):
+        record = _reader[i]
+        try:
+            result = _scorer.score(record)
+        except Exception as e:
+            result = {"error": str(e)}
+        lines.append(json.dumps({"index": i, "key": record["key"], **result}, ensure_ascii=False))
+    return lines
+
+
+def _resume_offset(output_path: str) -> int:
+    """Count complete lines in output_path, truncating a trailing partial line."""
+    if not os.path.exists(output_path):
+        return 0
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        complete = data.rfind(b"\n") + 1
+        if complete != len(data):
+            f.truncate(complete)
+    return data.count(b"\n", 0, complete)
+
+
+def _report(done: int, total: int, started: float, scored: int) -> None:
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    rate = scored / elapsed
+    eta = (total - done) / rate if rate else float("inf")
+    sys.stderr.write(f"\r{done}/{total} ({done / total:6.1%})  {rate:,.0f} rec/s  ETA {eta:,.0f}s   ")
+    sys.stderr.flush()
+
+
+def rescore(archive_path: str, output_path: str, workers: Optional[int] = None,
+            chunk_size: int = 500, pause_threshold: float = 0.3, quiet: bool = False) -> int:
+    """Score every record not yet present in output_path; returns the number scored."""
+    with ArchiveReader(archive_path) as reader:
+        total = len(reader)
+
+    streaming = output_path == "-"
+    start = 0 if streaming else _resume_offset(output_path)
+    if start > total:
+        raise ValueError(f"{output_path} has {start} results but {archive_path} only {total} records")
+    if start and not quiet:
+        sys.stderr.write(f"Resuming at record {start}\n")
+
+    chunks = [(lo, min(lo + chunk_size, total)) for lo in range(start, total, chunk_size)]
+    out = sys.stdout if streaming else open(output_path, "a", encoding="utf8")
+    started = last_report = time.perf_counter()
+    done = start
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                               initargs=(archive_path, pause_threshold))
+    try:
+        # map() yields in submission order, so the output stays a contiguous prefix
+        for lines in pool.map(_score_chunk, chunks):
+            out.write("\n".join(lines) + "\n")
+            out.flush()
+            done += len(lines)
+            if not quiet and (time.perf_counter() - last_report > 0.5 or done == total):
+                _report(done, total, started, done - start)
+                last_report = time.perf_counter()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        if not streaming:
+            out.close()
+        if not quiet:
+            sys.stderr.write("\n")
+    return done - start
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("archive", help="alignment archive written by app.archive")
+    parser.add_argument("-o", "--output", required=True, help="output JSONL path, or - for stdout")
+    parser.add_argument("--workers", type=int, default=None, help="process count (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--pause-threshold", type=float, default=0.3)
+    parser.add_argument("--quiet", action="store_true", help="disable progress output")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        scored = rescore(args.archive, args.output, workers=args.workers, chunk_size=args.chunk_size,
+                         pause_threshold=args.pause_threshold, quiet=args.quiet)
+    except KeyboardInterrupt:
+        sys.stderr.write("Interrupted; re-run the same command to resume\n")
+        sys.exit(130)
+    if not args.quiet:
+        elapsed = time.perf_counter() - started
+        sys.stderr.write(f"Scored {scored} records in {elapsed:.1f}s ({scored / max(elapsed, 1e-9):,.0f} rec/s)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,7 @@
 class PronunciationScorer:
+    def __init__(self, pause_threshold=0.3):
+        self.pause_threshold = pause_threshold
+
     def score(self, alignment_data):
         expected_phonemes = alignment_data.get("expected_phonemes", [])
         alignment = alignment_data.get("alignment", [])
@@ -42,10 +45,9 @@ class PronunciationScorer:
         speech_rate = total_phonemes / total_duration if total_duration > 0 else 0
 
         pause_count = 0
-        pause_threshold = 0.3
         for i in range(len(alignment) - 1):
             gap = alignment[i + 1]['start'] - alignment[i]['end']
-            if gap > pause_threshold:
+            if gap > self.pause_threshold:
                 pause_count += 1
 
         phoneme_durations = [